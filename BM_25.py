@@ -1,23 +1,45 @@
 # BM_25.py
 
 import os
-import json
+import orjson
 import pickle
-from rank_bm25 import BM25Okapi
-import nltk
-from nltk.tokenize import word_tokenize
-from bs4 import BeautifulSoup
+from collections import Counter
+from datetime import datetime
+from functools import lru_cache
+import re
+import threading
+import time
+
+import numpy as np
+import scipy.sparse as sp
+from joblib import Parallel, delayed
+from numba import njit
+from selectolax.parser import HTMLParser
+import logging
+
 from pymongo import MongoClient
+from pymongo.errors import PyMongoError
 from fastapi import HTTPException
-from traceback import format_exc
 
+logger = logging.getLogger(__name__)
+
+
+# BM25 hyperparameters (Okapi defaults, same as rank_bm25 used previously).
+# k1+1 and 1-b are folded out as module constants so the scoring expressions
+# compile with them baked in rather than re-deriving per call.
+BM25_K1 = 1.5
+BM25_B = 0.75
+BM25_K1P1 = BM25_K1 + 1.0
+BM25_ONE_MB = 1.0 - BM25_B
+
+# Only alphabetic tokens are ever kept, so a single regex sweep replaces the
+# Punkt/Treebank tokenizers (and the isalpha filter) entirely
+_TOKEN_RE = re.compile(r"[a-z]+")
 
-# Ensure required NLTK data is downloaded
-for resource in ["punkt", "punkt_tab"]:
-    try:
-        nltk.data.find(f"tokenizers/{resource}")
-    except LookupError:
-        nltk.download(resource, quiet=True)
+
+def _tokenize(text):
+    """Lowercase and split into alphabetic tokens."""
+    return _TOKEN_RE.findall(text.lower())
 
 
 # -----------------------------
@@ -26,13 +48,18 @@ for resource in ["punkt", "punkt_tab"]:
 
 def load_students(filepath='students.json'):
     """Load students from a JSON file."""
-    with open(filepath, 'r') as file:
-        return json.load(file)
+    with open(filepath, 'rb') as file:
+        return orjson.loads(file.read())
+
+# Only the fields the matcher reads; keeps unrelated payload off the wire
+JOB_PROJECTION = {'title': 1, 'tagsAndSkills': 1, 'jobDescription': 1,
+                  'companyName': 1}
+
 
 def load_jobs_from_mongo(uri=None, db_name=None, coll_name=None):
     """
-    Load all job documents from MongoDB Atlas.
-    Expects each document to have at least 'title', 'tagsAndSkills', 'jobDescription', etc.
+    Load job documents from MongoDB Atlas, fetching only the projected
+    fields in 1000-document cursor batches.
     """
     # fallback to environment variables if not passed explicitly
     uri       = uri       or os.getenv("MONGODB_URI")
@@ -46,7 +73,7 @@ def load_jobs_from_mongo(uri=None, db_name=None, coll_name=None):
     db     = client[db_name]
     coll   = db[coll_name]
 
-    jobs = list(coll.find({}))
+    jobs = list(coll.find({}, projection=JOB_PROJECTION, batch_size=1000))
     client.close()
     print(f"✅ Loaded {len(jobs)} jobs from MongoDB collection `{db_name}.{coll_name}`.")
     return jobs
@@ -56,152 +83,631 @@ def load_jobs_from_mongo(uri=None, db_name=None, coll_name=None):
 # Preprocessing
 # -----------------------------
 
-def preprocess_jobs(jobs):
+def _strip_html(raw_html):
+    """Strip HTML tags to plain text with single-space separators."""
+    if not raw_html:
+        return ''
+    return ' '.join(HTMLParser(raw_html).text(separator=' ').split())
+
+
+# Shard size for parallel preprocessing; small corpora stay sequential
+_PREPROCESS_CHUNK = 1000
+
+
+def _preprocess_chunk(jobs_chunk, start_idx):
     """
-    Convert job descriptions (HTML) into token lists suitable for BM25.
-    Returns:
-        job_texts: List of token lists for BM25
-        job_index: Original indices of jobs that produced valid tokens
+    Strip and tokenize one shard of jobs.
+    Returns (token lists, indices, metadata), where metadata carries the
+    company, title and description snippet each match will need — built here
+    once so query time never touches HTML again.
     """
     job_texts = []
     job_index = []
+    job_meta = []
 
-    for idx, job in enumerate(jobs):
+    for offset, job in enumerate(jobs_chunk):
         title = job.get('title', '')
         tags = job.get('tagsAndSkills', '').replace(',', ' ')
         raw_description = job.get('jobDescription', '')
 
-        soup = BeautifulSoup(raw_description, 'html.parser')
-        plain_description = soup.get_text(separator=' ', strip=True)
+        plain_description = _strip_html(raw_description)
 
         combined_text = f"{title} {tags} {plain_description}".strip()
         if not combined_text:
             continue
 
-        tokens = word_tokenize(combined_text.lower())
-        tokens = [t for t in tokens if t.isalpha()]  # keep alphabetic tokens only
+        tokens = _tokenize(combined_text)
 
         if not tokens:
             continue
 
+        snippet = plain_description[:150] + ('...' if len(plain_description) > 150 else '')
         job_texts.append(tokens)
-        job_index.append(idx)
+        job_index.append(start_idx + offset)
+        job_meta.append({
+            'company': job.get('companyName', 'Unknown Company'),
+            'title': job.get('title', 'No Title'),
+            'snippet': snippet,
+        })
+
+    return job_texts, job_index, job_meta
+
+
+def preprocess_jobs(jobs):
+    """
+    Convert job descriptions (HTML) into int32 token-id documents.
+    Stripping + tokenizing is a pure map over jobs, so large corpora are
+    split into shards and processed across all cores. Token strings are
+    then interned into a single vocab dict and each document becomes a
+    compact np.int32 id array instead of a list of str objects.
+    Returns:
+        doc_ids: List of np.int32 token-id arrays, one per valid job
+        vocab: dict mapping token -> int id
+        job_index: Original indices of jobs that produced valid tokens
+        job_meta: Per-valid-job dicts of company, title and snippet
+    """
+    if len(jobs) <= _PREPROCESS_CHUNK:
+        job_texts, job_index, job_meta = _preprocess_chunk(jobs, 0)
+    else:
+        shards = [(jobs[i:i + _PREPROCESS_CHUNK], i)
+                  for i in range(0, len(jobs), _PREPROCESS_CHUNK)]
+        results = Parallel(n_jobs=-1, backend='loky', batch_size='auto')(
+            delayed(_preprocess_chunk)(chunk, start) for chunk, start in shards
+        )
+        job_texts = []
+        job_index = []
+        job_meta = []
+        for texts, indices, meta in results:
+            job_texts.extend(texts)
+            job_index.extend(indices)
+            job_meta.extend(meta)
 
     if not job_texts:
         raise ValueError("❌ No valid job descriptions found.")
 
-    return job_texts, job_index
+    vocab = {}
+    doc_ids = [
+        np.fromiter((vocab.setdefault(t, len(vocab)) for t in tokens),
+                    dtype=np.int32, count=len(tokens))
+        for tokens in job_texts
+    ]
+    return doc_ids, vocab, job_index, job_meta
 
 
 # -----------------------------
 # BM25 Core
 # -----------------------------
 
-def build_bm25_model(job_texts):
-    """Build and return a BM25Okapi model trained on the given token lists."""
-    return BM25Okapi(job_texts)
+@njit(cache=True, fastmath=True)
+def _accumulate_weighted(indices, data, weight, admit_new, scores, candidate):
+    """
+    Add one weighted posting list into the dense score accumulator. With
+    admit_new False only existing candidates are updated (MaxScore pruning).
+    cache=True persists the compiled kernel on disk so cold starts skip JIT.
+    """
+    for pos in range(indices.shape[0]):
+        d = indices[pos]
+        if admit_new or candidate[d]:
+            scores[d] += weight * data[pos]
+            candidate[d] = True
+
+
+class BM25Index:
+    """
+    Eagerly scored BM25 index (BM25S-style).
+
+    All BM25 arithmetic happens at build time: entry (t, d) of the sparse
+    matrix holds the full BM25 contribution of term t to document d,
+    `idf(t) * tf * (k1 + 1) / (tf + k1 * (1 - b + b * len_d / avg_len))`.
+    Query scoring reduces to selecting the query tokens' rows and summing —
+    one memory-bound sparse reduction instead of per-term Python loops.
+    """
+
+    def __init__(self, tokens, matrix, idf=None, avg_dl=None):
+        self.tokens = tokens                                 # list[str], row order
+        self.vocab = {t: i for i, t in enumerate(tokens)}    # token -> matrix row
+        self.matrix = matrix                                 # csr (|V|, n_docs), float32
+        self.n_docs = matrix.shape[1]
+        # Kept for incremental updates: scoring a new doc needs per-term IDF
+        # and the average doc length from the last full build
+        self.idf = idf                                       # float32 per row, or None
+        self.avg_dl = avg_dl                                 # float, or None
+        # Per-term score upper bound, used by MaxScore pruning in top_k
+        self.max_scores = np.asarray(matrix.max(axis=1).toarray(),
+                                     dtype=np.float32).ravel()
+        # Serializes structural mutations (append/remove). Readers don't
+        # lock: they snapshot self.matrix once and work off that object,
+        # and mutators swap in a fresh matrix instead of editing arrays
+        # an in-flight query may be iterating
+        self._lock = threading.Lock()
+
+    def append_document(self, tokens):
+        """
+        Append one document as a new matrix column and return its column id.
+        Scores use the IDF and avg doc length frozen at the last full build,
+        and tokens outside the frozen vocab are dropped — acceptable drift
+        between full rebuilds. max_scores is raised *before* the swap and
+        only ever grows, so the bounds stay valid whichever matrix a
+        concurrent reader snapshotted.
+        """
+        with self._lock:
+            matrix = self.matrix
+            col_id = matrix.shape[1]
+            counts = Counter(t for t in tokens if t in self.vocab)
+            if counts and self.idf is not None and self.avg_dl is not None:
+                norm = BM25_K1 * (BM25_ONE_MB + BM25_B * len(tokens) / self.avg_dl)
+                rows = np.array([self.vocab[t] for t in counts], dtype=np.int32)
+                tfs = np.array(list(counts.values()), dtype=np.float32)
+                values = (self.idf[rows] * tfs * BM25_K1P1 / (tfs + norm)).astype(np.float32)
+                column = sp.csr_matrix(
+                    (values, (rows, np.zeros(rows.shape[0], dtype=np.int32))),
+                    shape=(len(self.tokens), 1),
+                )
+                np.maximum.at(self.max_scores, rows, values)
+            else:
+                # Keep column ids aligned with job_index even for unscorable docs
+                column = sp.csr_matrix((len(self.tokens), 1), dtype=np.float32)
+
+            new_matrix = sp.hstack([matrix, column], format='csr')
+            self.matrix = new_matrix
+            self.n_docs = new_matrix.shape[1]
+        return col_id
+
+    def remove_document(self, col_id):
+        """
+        Drop a document's entries (soft delete: the column stays, empty).
+        Rebuilds the matrix without them and swaps the reference, so
+        in-flight readers keep iterating their own snapshot and cache-loaded
+        read-only mmaps are never written. max_scores is left as-is: a stale
+        upper bound only weakens pruning, never correctness.
+        """
+        with self._lock:
+            coo = self.matrix.tocoo()
+            keep = coo.col != col_id
+            self.matrix = sp.csr_matrix(
+                (coo.data[keep], (coo.row[keep], coo.col[keep])),
+                shape=self.matrix.shape,
+            )
+
+    def get_scores(self, query_tokens):
+        """
+        Return a float32 score array over all documents for the query.
+        Duplicate query tokens (the roles x5 / prefs x2 weighting) collapse
+        to (row, weight) pairs so each posting list is traversed once.
+        """
+        matrix = self.matrix  # snapshot: concurrent mutations swap, not edit
+        term_weights = Counter(t for t in query_tokens if t in self.vocab)
+        if not term_weights:
+            return np.zeros(matrix.shape[1], dtype=np.float32)
+        rows = [self.vocab[t] for t in term_weights]
+        weights = np.fromiter(term_weights.values(), dtype=np.float32,
+                              count=len(term_weights))
+        return np.asarray(matrix[rows].T.dot(weights),
+                          dtype=np.float32).ravel()
+
+    def get_scores_batch(self, queries):
+        """
+        Score many tokenized queries in one sparse GEMM.
+        Builds a (n_queries, |V|) token-count matrix Q and computes
+        Q @ matrix, returning a dense (n_queries, n_docs) float32 array.
+        """
+        rows, cols, counts = [], [], []
+        for query_id, tokens in enumerate(queries):
+            for token, count in Counter(tokens).items():
+                row = self.vocab.get(token)
+                if row is not None:
+                    rows.append(query_id)
+                    cols.append(row)
+                    counts.append(count)
+
+        matrix = self.matrix  # snapshot: concurrent mutations swap, not edit
+        q = sp.csr_matrix(
+            (np.array(counts, dtype=np.float32),
+             (np.array(rows, dtype=np.int32), np.array(cols, dtype=np.int32))),
+            shape=(len(queries), len(self.tokens)),
+        )
+        return np.asarray((q @ matrix).todense(), dtype=np.float32)
+
+    def top_k(self, query_tokens, top_n):
+        """
+        Return (doc_ids, scores) of the top_n best documents, sorted by score
+        descending, using MaxScore pruning: tokens are processed in decreasing
+        order of their score upper bound, and once the current k-th best score
+        exceeds the summed upper bounds of the remaining tokens, no unseen
+        document can enter the top-n, so only existing candidates are updated.
+        """
+        term_weights = Counter(t for t in query_tokens if t in self.vocab)
+        empty = (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32))
+        if not term_weights:
+            return empty
+        # Duplicate tokens become weights, so each posting list is walked
+        # once; bounds are weighted accordingly
+        terms = [(self.vocab[t], float(w)) for t, w in term_weights.items()]
+        terms.sort(key=lambda rw: rw[1] * float(self.max_scores[rw[0]]),
+                   reverse=True)
+
+        # Snapshot once: mutators swap self.matrix rather than editing it, so
+        # indptr/indices/data and the accumulator sizes stay consistent even
+        # if the watcher appends or removes a document mid-query
+        matrix = self.matrix
+        indptr = matrix.indptr
+        indices = matrix.indices
+        data = matrix.data
+        remaining = sum(w * float(self.max_scores[r]) for r, w in terms)
+
+        scores = np.zeros(matrix.shape[1], dtype=np.float32)
+        candidate = np.zeros(matrix.shape[1], dtype=np.bool_)
+        admit_new = True
+        for r, w in terms:
+            remaining -= w * float(self.max_scores[r])
+            lo, hi = indptr[r], indptr[r + 1]
+            _accumulate_weighted(indices[lo:hi], data[lo:hi], np.float32(w),
+                                 admit_new, scores, candidate)
+            if admit_new and int(candidate.sum()) >= top_n:
+                kth_best = np.partition(scores, scores.shape[0] - top_n)[-top_n]
+                if kth_best >= remaining:
+                    admit_new = False
+
+        doc_ids = np.nonzero(candidate)[0]
+        if doc_ids.shape[0] == 0:
+            return empty
+        doc_scores = scores[doc_ids]
+        if doc_scores.shape[0] > top_n:
+            # O(N) selection instead of sorting every candidate
+            keep = np.argpartition(doc_scores, -top_n)[-top_n:]
+            doc_ids, doc_scores = doc_ids[keep], doc_scores[keep]
+        order = np.argsort(-doc_scores)
+        return doc_ids[order].astype(np.int64), doc_scores[order]
+
+
+def build_bm25_model(doc_ids, vocab):
+    """Build an eagerly scored sparse BM25 index from int32 token-id docs."""
+    n_docs = len(doc_ids)
+    n_terms = len(vocab)
+    doc_lens = np.array([ids.shape[0] for ids in doc_ids], dtype=np.float32)
+    avg_dl = float(doc_lens.mean())
+    doc_norms = (BM25_K1 * (BM25_ONE_MB + BM25_B * doc_lens / avg_dl)).astype(np.float32)
+
+    # Per-doc unique terms + counts, and document frequency for IDF
+    doc_unique = [np.unique(ids, return_counts=True) for ids in doc_ids]
+    df = np.zeros(n_terms, dtype=np.int64)
+    for unique_ids, _ in doc_unique:
+        df[unique_ids] += 1
+
+    # Lucene-style IDF: always positive, no floor needed
+    idf = np.log1p((n_docs - df + 0.5) / (df + 0.5)).astype(np.float32)
+
+    # Fill (row, col, value) triplets with the fully evaluated BM25 score
+    nnz = sum(unique_ids.shape[0] for unique_ids, _ in doc_unique)
+    rows = np.empty(nnz, dtype=np.int32)
+    cols = np.empty(nnz, dtype=np.int32)
+    data = np.empty(nnz, dtype=np.float32)
+    pos = 0
+    for doc_id, (unique_ids, tfs) in enumerate(doc_unique):
+        n = unique_ids.shape[0]
+        tfs = tfs.astype(np.float32)
+        rows[pos:pos + n] = unique_ids
+        cols[pos:pos + n] = doc_id
+        data[pos:pos + n] = idf[unique_ids] * tfs * BM25_K1P1 / (tfs + doc_norms[doc_id])
+        pos += n
+
+    tokens = sorted(vocab, key=vocab.get)
+    matrix = sp.csr_matrix((data, (rows, cols)), shape=(n_terms, n_docs))
+    return BM25Index(tokens, matrix, idf=idf, avg_dl=avg_dl)
+
+# Arrays persisted per index build; each is its own .npy so it can be
+# memory-mapped (zipped .npz members cannot be mmapped)
+_CACHE_SUBDIR = "bm25_cache"
+_CACHE_ARRAYS = ("data", "indices", "indptr", "shape", "idf", "avg_dl",
+                 "vocab", "job_index", "companies", "titles", "snippets")
+
 
 def build_or_load_bm25(jobs, cache_dir="."):
     """
-    Load cached BM25 model and job index if available, else build and save them.
+    Load cached BM25 index and job index if available, else build and save them.
+    The cache is a directory of plain .npy arrays opened with mmap_mode='r':
+    startup maps pages lazily instead of walking a pickled object graph, and
+    uvicorn workers share the arrays through the page cache.
     Returns:
-        bm25: BM25Okapi instance
+        bm25: BM25Index instance
         job_index: Index of jobs
+        job_meta: Per-column dicts of company, title and snippet
     """
-    bm25_path = os.path.join(cache_dir, "bm25_model.pkl")
-    index_path = os.path.join(cache_dir, "job_index.pkl")
+    cache_path = os.path.join(cache_dir, _CACHE_SUBDIR)
+    paths = {name: os.path.join(cache_path, f"{name}.npy")
+             for name in _CACHE_ARRAYS}
+    token_path = os.path.join(cache_dir, RESUME_TOKEN_FILE)
+
+    # A leftover resume token means a previous run applied change-stream
+    # events on top of this cache without persisting the mutated index; the
+    # cached arrays no longer match the stream position (and the cached
+    # job_index no longer lines up with a fresh jobs fetch), so rebuild.
+    cache_valid = (all(os.path.exists(p) for p in paths.values())
+                   and not os.path.exists(token_path))
+
+    if cache_valid:
+        arrays = {name: np.load(path, mmap_mode='r', allow_pickle=False)
+                  for name, path in paths.items()}
+        # Scores and IDF are stored as float16 (ordering-only values need no
+        # more); upcast to float32 in memory since SciPy's sparse kernels
+        # have no half-precision support
+        matrix = sp.csr_matrix(
+            (np.asarray(arrays["data"], dtype=np.float32),
+             arrays["indices"], arrays["indptr"]),
+            shape=tuple(arrays["shape"]),
+        )
+        tokens = bytes(arrays["vocab"]).decode('utf-8').splitlines()
+        bm25 = BM25Index(tokens, matrix,
+                         idf=np.asarray(arrays["idf"], dtype=np.float32),
+                         avg_dl=float(arrays["avg_dl"]))
+        job_index = arrays["job_index"].tolist()
+        job_meta = [
+            {'company': str(c), 'title': str(t), 'snippet': str(s)}
+            for c, t, s in zip(arrays["companies"], arrays["titles"],
+                               arrays["snippets"])
+        ]
+        print("✅ Loaded BM25 index from cache (mmap).")
+        return bm25, job_index, job_meta
+    else:
+        doc_ids, vocab, job_index, job_meta = preprocess_jobs(jobs)
+        bm25 = build_bm25_model(doc_ids, vocab)
+
+        os.makedirs(cache_path, exist_ok=True)
+        matrix = bm25.matrix
+        np.save(paths["data"], matrix.data.astype(np.float16))
+        np.save(paths["indices"], matrix.indices)
+        np.save(paths["indptr"], matrix.indptr)
+        np.save(paths["shape"], np.array(matrix.shape, dtype=np.int64))
+        np.save(paths["idf"], bm25.idf.astype(np.float16))
+        np.save(paths["avg_dl"], np.float64(bm25.avg_dl))
+        np.save(paths["vocab"],
+                np.frombuffer("\n".join(bm25.tokens).encode('utf-8'),
+                              dtype=np.uint8))
+        np.save(paths["job_index"], np.array(job_index, dtype=np.int32))
+        np.save(paths["companies"],
+                np.array([m['company'] for m in job_meta], dtype=str))
+        np.save(paths["titles"],
+                np.array([m['title'] for m in job_meta], dtype=str))
+        np.save(paths["snippets"],
+                np.array([m['snippet'] for m in job_meta], dtype=str))
+
+        # The freshly fetched jobs already include everything the old stream
+        # had applied, so the stale token (if any) is no longer needed
+        if os.path.exists(token_path):
+            os.remove(token_path)
+
+        print("✅ Built and cached BM25 index.")
+        return bm25, job_index, job_meta
 
-    if os.path.exists(bm25_path) and os.path.exists(index_path):
-        with open(bm25_path, "rb") as f1, open(index_path, "rb") as f2:
-            bm25 = pickle.load(f1)
-            job_index = pickle.load(f2)
-        print("✅ Loaded BM25 model and index from cache.")
-        return bm25, job_index
-    else: 
-        job_texts, job_index = preprocess_jobs(jobs)
-        bm25 = build_bm25_model(job_texts)
 
-        with open(bm25_path, "wb") as f1, open(index_path, "wb") as f2:
-            pickle.dump(bm25, f1)
-            pickle.dump(job_index, f2)
+# -----------------------------
+# Incremental Refresh (Change Streams)
+# -----------------------------
+
+RESUME_TOKEN_FILE = ".resume_token"
+
+
+def _apply_change(event, jobs, bm25, job_index, job_meta, id_to_pos, pos_to_col):
+    """Apply one change-stream event to the in-memory jobs/index structures."""
+    op = event['operationType']
+    doc_id = event['documentKey']['_id']
+    pos = id_to_pos.get(doc_id)
+
+    # Retire the existing column; soft-deleted columns never surface in top-k
+    if op in ('update', 'replace', 'delete') and pos is not None:
+        col = pos_to_col.pop(pos, None)
+        if col is not None:
+            bm25.remove_document(col)
+    if op == 'delete':
+        return
+
+    doc = event.get('fullDocument')
+    if doc is None:
+        return
+
+    if pos is None:
+        pos = len(jobs)
+        jobs.append(doc)
+        id_to_pos[doc_id] = pos
+    else:
+        jobs[pos] = doc
+
+    texts, _, meta = _preprocess_chunk([doc], 0)
+    # Extend meta/index *before* the column becomes visible so a reader that
+    # snapshots the new matrix never indexes past the end of job_meta; keep
+    # meta aligned with columns even when the doc had no usable tokens
+    job_index.append(pos)
+    job_meta.append(meta[0] if meta else {
+        'company': doc.get('companyName', 'Unknown Company'),
+        'title': doc.get('title', 'No Title'),
+        'snippet': '',
+    })
+    col = bm25.append_document(texts[0] if texts else [])
+    pos_to_col[pos] = col
+
+
+def watch_jobs(jobs, bm25, job_index, job_meta, uri=None, db_name=None,
+               coll_name=None, cache_dir=".", on_change=None, poll_interval=60.0):
+    """
+    Keep the in-memory jobs list and BM25 index in sync with MongoDB.
+
+    Opens a change stream on the jobs collection and applies insert/update/
+    delete events to the index in place — O(changed doc) instead of a full
+    reload + rebuild. The applied mutations are never written back to the
+    on-disk cache, so the resume token saved after each event serves as a
+    staleness marker: build_or_load_bm25 rebuilds from a fresh fetch (and
+    clears the token) whenever one is present, and the stream here always
+    starts from now, on top of an index that matches the current fetch. On
+    deployments without a replica set (change streams unavailable) this
+    falls back to polling on `updatedAt`.
+
+    Runs forever; use start_jobs_watcher to put it on a daemon thread.
+    """
+    uri       = uri       or os.getenv("MONGODB_URI")
+    db_name   = db_name   or os.getenv("MONGODB_DB", "your_default_db")
+    coll_name = coll_name or os.getenv("MONGODB_COLL", "your_default_coll")
+
+    if not uri:
+        raise ValueError("MongoDB URI must be provided via parameter or MONGODB_URI env var")
+
+    client = MongoClient(uri)
+    coll = client[db_name][coll_name]
 
-        print("✅ Built and cached BM25 model and index.")
-        return bm25, job_index
+    id_to_pos = {job.get('_id'): pos for pos, job in enumerate(jobs)}
+    pos_to_col = {pos: col for col, pos in enumerate(job_index)}
+
+    token_path = os.path.join(cache_dir, RESUME_TOKEN_FILE)
+
+    pipeline = [{'$match': {'operationType': {'$in': ['insert', 'update', 'replace', 'delete']}}}]
+    try:
+        with coll.watch(pipeline, full_document='updateLookup') as stream:
+            print("✅ Watching job collection for incremental index updates.")
+            for event in stream:
+                _apply_change(event, jobs, bm25, job_index, job_meta,
+                              id_to_pos, pos_to_col)
+                with open(token_path, 'wb') as f:
+                    f.write(orjson.dumps(stream.resume_token))
+                if on_change is not None:
+                    on_change()
+    except PyMongoError as e:
+        print(f"⚠️ Change stream unavailable ({e}); falling back to `updatedAt` polling.")
+        last_seen = datetime.utcnow()
+        while True:
+            time.sleep(poll_interval)
+            try:
+                changed = list(coll.find({'updatedAt': {'$gt': last_seen}},
+                                         projection=JOB_PROJECTION))
+            except PyMongoError as poll_error:
+                print("⚠️ Poll for job changes failed:", poll_error)
+                continue
+            last_seen = datetime.utcnow()
+            for doc in changed:
+                _apply_change(
+                    {'operationType': 'update',
+                     'documentKey': {'_id': doc.get('_id')},
+                     'fullDocument': doc},
+                    jobs, bm25, job_index, job_meta, id_to_pos, pos_to_col,
+                )
+            if changed:
+                # Same staleness marker as the stream path: the in-memory
+                # index has drifted from the on-disk cache, so the next
+                # startup must rebuild instead of loading it.
+                with open(token_path, 'wb') as f:
+                    f.write(orjson.dumps({'polled': True}))
+                if on_change is not None:
+                    on_change()
+
+
+def start_jobs_watcher(jobs, bm25, job_index, job_meta, on_change=None, **kwargs):
+    """Run watch_jobs on a daemon thread and return the thread."""
+    thread = threading.Thread(
+        target=watch_jobs,
+        args=(jobs, bm25, job_index, job_meta),
+        kwargs=dict(on_change=on_change, **kwargs),
+        daemon=True,
+        name="jobs-change-stream",
+    )
+    thread.start()
+    return thread
 
 
 # -----------------------------
 # Matching Logic
 # -----------------------------
 
-def match_students_to_jobs(students, jobs, bm25, job_index, top_n=10):
+@lru_cache(maxsize=8192)
+def _tokenize_query(query_terms):
     """
-    For each student, compute BM25 scores against all jobs and return structured match data.
-    Returns a dictionary with student names as keys and a list of matches as values.
+    Tokenize a frozen tuple of query terms. Cached so a re-submitted profile
+    (common in dev and A/B runs) skips tokenization entirely; callers treat
+    the returned list as read-only.
     """
-    try:
-        all_matches = {}
+    return _tokenize(" ".join(query_terms))
+
+
+def _student_query_tokens(student):
+    """Build the weighted query token list for one student profile."""
+    job_preferences = student.get('job_preferences', {})
+    job_preferences_list = []
+    job_roles = []
+
+    if isinstance(job_preferences, dict):
+        for key, value in job_preferences.items():
+            if isinstance(value, list):
+                if key.lower() in ['job_roles', 'job_titles']:
+                    job_roles.extend(value)
+                else:
+                    job_preferences_list.extend(value)
+            elif isinstance(value, str):
+                if key.lower() in ['job_roles', 'job_titles']:
+                    job_roles.append(value)
+                else:
+                    job_preferences_list.append(value)
+
+    skills = student.get('skills', [])
+    interests = student.get('interests', [])
+
+    query_terms = job_roles * 5 + job_preferences_list * 2 + skills + interests
+    if not query_terms:
+        return []
+
+    return _tokenize_query(tuple(query_terms))
+
 
+def match_students_to_jobs(students, job_meta, bm25, top_n=10):
+    """
+    Match every student against all jobs in one vectorized pass.
+    Returns a dictionary with student names as keys and a list of matches as
+    values. Match fields come from the precomputed job_meta, so no HTML is
+    touched at query time.
+    """
+    try:
+        names = []
+        queries = []
         for student in students:
             # Construct full name (fallback to "Unnamed" if missing)
             first_name = student.get('first_name', '')
             last_name = student.get('last_name', '')
-            student_name = f"{first_name} {last_name}".strip() or "Unnamed"
-
-            job_preferences = student.get('job_preferences', {})
-            job_preferences_list = []
-            job_roles = []
-
-            if isinstance(job_preferences, dict):
-                for key, value in job_preferences.items():
-                    if isinstance(value, list):
-                        if key.lower() in ['job_roles', 'job_titles']:
-                            job_roles.extend(value)
-                        else:
-                            job_preferences_list.extend(value)
-                    elif isinstance(value, str):
-                        if key.lower() in ['job_roles', 'job_titles']:
-                            job_roles.append(value)
-                        else:
-                            job_preferences_list.append(value)
-
-            skills = student.get('skills', [])
-            interests = student.get('interests', [])
-
-            query_terms = job_roles * 5 + job_preferences_list * 2 + skills + interests
-            if not query_terms:
-                all_matches[student_name] = []
-                continue
-
-            query = " ".join(query_terms)
-            query_tokens = word_tokenize(query.lower())
-            query_tokens = [t for t in query_tokens if t.isalpha()]
-
-            scores = bm25.get_scores(query_tokens)
-            ranked = sorted(zip(job_index, scores), key=lambda x: x[1], reverse=True)
-            top_matches = ranked[:top_n]
-
+            names.append(f"{first_name} {last_name}".strip() or "Unnamed")
+            queries.append(_student_query_tokens(student))
+
+        all_matches = {name: [] for name in names}
+        scored = [i for i, q in enumerate(queries) if q]
+        if not scored:
+            return all_matches
+
+        # A lone student goes through the MaxScore-pruned path; a batch is
+        # scored all at once as one sparse GEMM over a query-count matrix.
+        results = {}
+        if len(scored) == 1:
+            i = scored[0]
+            results[i] = bm25.top_k(queries[i], top_n)
+        else:
+            score_matrix = bm25.get_scores_batch([queries[i] for i in scored])
+            k = min(top_n, score_matrix.shape[1])
+            for row, i in enumerate(scored):
+                row_scores = score_matrix[row]
+                keep = np.argpartition(-row_scores, k - 1)[:k]
+                keep = keep[row_scores[keep] > 0.0]
+                doc_ids = keep[np.argsort(-row_scores[keep])]
+                results[i] = (doc_ids, row_scores[doc_ids])
+
+        for i, (doc_ids, doc_scores) in results.items():
             student_matches = []
-            for idx, score in top_matches:
-                job = jobs[idx]
-                company = job.get('companyName', 'Unknown Company')
-                title = job.get('title', 'No Title')
-                description_html = job.get('jobDescription', '')
-                description_text = BeautifulSoup(description_html, 'html.parser').get_text(separator=' ', strip=True)
-                snippet = description_text[:150] + ('...' if len(description_text) > 150 else '')
-
+            for d, score in zip(doc_ids, doc_scores):
+                meta = job_meta[int(d)]
                 student_matches.append({
-                    'company': company,
-                    'title': title,
+                    'company': meta['company'],
+                    'title': meta['title'],
                     'score': float(score),
-                    'snippet': snippet
+                    'snippet': meta['snippet']
                 })
 
-            all_matches[student_name] = student_matches
+            all_matches[names[i]] = student_matches
 
         return all_matches
     except Exception as e:
-        print("❌ Error during match_students:", str(e))
-        print("🔍 Traceback:", format_exc())  # Logs full traceback
+        logger.exception("Error during match_students")
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -214,8 +720,8 @@ if __name__ == '__main__':
     jobs = load_jobs_from_mongo()
 
     print(f"Total jobs loaded: {len(jobs)}")
-    bm25, job_index = build_or_load_bm25(jobs)
-    matches = match_students_to_jobs(students, jobs, bm25, job_index, top_n=10)
+    bm25, job_index, job_meta = build_or_load_bm25(jobs)
+    matches = match_students_to_jobs(students, job_meta, bm25, top_n=10)
 
     with open('student_job_matches.pkl', 'wb') as pkl_file:
         pickle.dump(matches, pkl_file)
@@ -1,6 +1,6 @@
 import os
 import pickle
-import json
+import orjson
 from openai import OpenAI
 import streamlit as st
 
@@ -73,9 +73,9 @@ Below is a JSON array of job postings (companies). When I give you a student pro
   • ...
 
 🎨 5. Format the output beautifully using bullet points, emojis, and bold headers. Only return a clean, structured, and human-readable evaluation. Sort it in most relevant to least relevant.
-""" + "\n\nHere are the company profiles:\n" + json.dumps(top_jobs, indent=2)
+""" + "\n\nHere are the company profiles:\n" + orjson.dumps(top_jobs, option=orjson.OPT_INDENT_2).decode()
 
-    user_prompt = "🎓 Student Profile JSON:\n" + json.dumps(student, indent=2)
+    user_prompt = "🎓 Student Profile JSON:\n" + orjson.dumps(student, option=orjson.OPT_INDENT_2).decode()
 
     # Send to LLM
     try:
@@ -2,20 +2,35 @@ from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import List, Dict, Any
+import asyncio
+import hashlib
 import os
-import json
+import orjson
+import threading
+from cachetools import TTLCache
 from dotenv import load_dotenv
 from datetime import datetime
 from supabase import create_client
-from utils.job_matcher import run_bm25_match
+from utils.job_matcher import run_bm25_match, set_on_change, startup_load
 from utils.chatbot_runner import analyze_matches
 from mangum import Mangum
-from BM_25 import load_jobs_from_mongo, build_or_load_bm25
 import logging
+from logging.handlers import QueueHandler, QueueListener
+import queue
 
 # Load .env variables
 load_dotenv()
 
+# Request-path logging goes through a queue so handler I/O (stdio flushes)
+# never blocks the event loop; a listener thread drains it
+_log_record_queue = queue.SimpleQueue()
+_log_listener = QueueListener(_log_record_queue, logging.StreamHandler())
+_log_listener.start()
+
+logger = logging.getLogger(__name__)
+logger.addHandler(QueueHandler(_log_record_queue))
+logger.setLevel(logging.INFO)
+
 # Initialize Supabase
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
@@ -33,10 +48,64 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Global cache variables
-bm25 = None
-job_index = None
-jobs = None
+# Short-TTL cache of full /match responses: identical payloads (common while
+# iterating in dev) skip both BM25 scoring and the LLM call
+_match_cache = TTLCache(maxsize=1024, ttl=120)
+_match_cache_lock = threading.Lock()
+
+def _clear_match_cache():
+    with _match_cache_lock:
+        _match_cache.clear()
+
+# Job data changed -> every cached response is stale
+set_on_change(_clear_match_cache)
+
+def _request_key(request):
+    """Stable hash of the request payload, used as the cache key."""
+    payload = orjson.dumps(request.dict(), option=orjson.OPT_SORT_KEYS)
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+# Supabase log inserts are batched off the request path: handlers enqueue the
+# payload and a background task flushes up to 50 rows or every 5 seconds
+_log_queue: asyncio.Queue = asyncio.Queue()
+_LOG_FLUSH_MAX = 50
+_LOG_FLUSH_SECS = 5.0
+
+async def _flush_logs_forever():
+    loop = asyncio.get_event_loop()
+    while True:
+        batch = [await _log_queue.get()]
+        deadline = loop.time() + _LOG_FLUSH_SECS
+        while len(batch) < _LOG_FLUSH_MAX:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(_log_queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        try:
+            await asyncio.to_thread(
+                lambda: supabase.table("v0001_logs").insert(batch).execute()
+            )
+            logger.debug("flushed %d log(s) to Supabase", len(batch))
+        except Exception:
+            logger.exception("Supabase log flush failed")
+
+# Strong reference to the flusher task — the event loop only keeps a weak
+# one, so without this the task can be garbage-collected mid-run
+_log_flusher_task = None
+
+@app.on_event("startup")
+async def _start_log_flusher():
+    global _log_flusher_task
+    _log_flusher_task = asyncio.create_task(_flush_logs_forever())
+
+@app.on_event("startup")
+async def _load_bm25():
+    # Pay the jobs fetch + index build once at process boot (off the event
+    # loop) instead of on the first /match request
+    await asyncio.to_thread(startup_load)
 
 # Request body schema
 class ProfileRequest(BaseModel):
@@ -53,12 +122,16 @@ def health_check():
     return {"status": "ok"}
 
 @app.post("/match")
-def match_students(request: ProfileRequest):
-    global bm25, job_index, jobs
-
+async def match_students(request: ProfileRequest):
     try:
-        print("✅ Received POST request to /match")
-        print("👨‍🎓 Students received:", len(request.students))
+        logger.debug("POST /match: students=%d", len(request.students))
+
+        cache_key = _request_key(request)
+        with _match_cache_lock:
+            cached = _match_cache.get(cache_key)
+        if cached is not None:
+            logger.debug("returning cached /match result")
+            return cached
 
         # Add shared interests to each student's job_preferences
         for student in request.students:
@@ -66,40 +139,34 @@ def match_students(request: ProfileRequest):
                 x.strip() for x in request.interests.split("+")
             ]
 
-        # Lazy-load BM25 and jobs only when first request hits
-        if bm25 is None or job_index is None or jobs is None:
-            print("🕒 BM25 not loaded yet — loading from MongoDB and building model...")
-            jobs = load_jobs_from_mongo()
-            bm25, job_index = build_or_load_bm25(jobs)
-            print("✅ BM25 model built and cached.")
-        else:
-            print("✅ BM25 model already loaded in memory.")
-
-        # Match jobs
-        matches, pickle_path = run_bm25_match(request.students)
-        print("🎯 BM25 Matching done. Pickle at:", pickle_path)
+        # Match jobs — the index was built at startup — CPU-bound, so keep it off the event loop; concurrent
+        # requests' matching and I/O can then overlap
+        matches, pickle_path = await asyncio.to_thread(run_bm25_match, request.students)
+        logger.debug("BM25 matching done, pickle at %s", pickle_path)
 
-        # Analyze matches using LLM
-        analysis = analyze_matches(pickle_path, request.students)
-        print("🧠 LLM Analysis generated.")
+        # Analyze matches using LLM (blocking HTTP client)
+        analysis = await asyncio.to_thread(analyze_matches, pickle_path, request.students)
+        logger.debug("LLM analysis generated")
 
         # Upload result to Supabase
         payload = {
             "timestamp": datetime.utcnow().isoformat(),
             "intern_name": request.intern_name,
-            "student_profile": json.dumps(request.students),
+            "student_profile": orjson.dumps(request.students).decode(),
             "bm25_matches": matches,
             "llm_analysis": analysis
         }
 
-        print("📤 Uploading to Supabase...")
-        supabase.table("v0001_logs").insert(payload).execute()
-        print("✅ Upload complete!")
+        # Enqueue for batched background upload instead of a round-trip here
+        await _log_queue.put(payload)
 
-        return {"success": True, "llm_analysis": analysis}
+        response = {"success": True, "llm_analysis": analysis}
+        with _match_cache_lock:
+            _match_cache[cache_key] = response
+        return response
 
     except Exception as e:
-        print("❌ ERROR OCCURRED:", str(e))
+        logger.exception("/match failed")
         raise HTTPException(status_code=500, detail=str(e))
 
 # AWS Lambda support via Mangum (can be ignored for Railway)
@@ -0,0 +1,39 @@
+# test_bm25.py
+
+import numpy as np
+
+from BM_25 import build_or_load_bm25
+
+JOBS = [
+    {'title': 'Backend Engineer', 'tagsAndSkills': 'python,fastapi',
+     'jobDescription': '<p>Build APIs with Python and FastAPI.</p>',
+     'companyName': 'Acme'},
+    {'title': 'Data Analyst', 'tagsAndSkills': 'sql,excel',
+     'jobDescription': '<p>Analyze dashboards and reports in SQL.</p>',
+     'companyName': 'Globex'},
+    {'title': 'ML Engineer', 'tagsAndSkills': 'python,pytorch',
+     'jobDescription': '<p>Train and deploy machine learning models.</p>',
+     'companyName': 'Initech'},
+    {'title': 'Frontend Developer', 'tagsAndSkills': 'react,javascript',
+     'jobDescription': '<p>Ship accessible React interfaces.</p>',
+     'companyName': 'Umbrella'},
+]
+
+
+def test_remove_document_after_cache_load(tmp_path):
+    cache_dir = str(tmp_path)
+
+    # Cold build writes the cache; second call loads it via mmap
+    build_or_load_bm25(JOBS, cache_dir=cache_dir)
+    bm25, job_index, job_meta = build_or_load_bm25(JOBS, cache_dir=cache_dir)
+
+    scores_before = bm25.get_scores(['python'])
+    assert scores_before[0] > 0.0
+
+    # Must not raise even though the matrix components are cache-loaded
+    bm25.remove_document(0)
+
+    scores_after = bm25.get_scores(['python'])
+    assert scores_after[0] == 0.0
+    # Every other document's score is untouched
+    assert np.allclose(scores_after[1:], scores_before[1:])
@@ -1,35 +1,71 @@
 # utils/job_matcher.py
 
+import logging
 import os
 import pickle
-from BM_25 import build_or_load_bm25, match_students_to_jobs, load_jobs_from_mongo
+import threading
+from BM_25 import (build_or_load_bm25, match_students_to_jobs,
+                   load_jobs_from_mongo, start_jobs_watcher)
+
+logger = logging.getLogger(__name__)
 
 # Module-level caches
 _JOBS = None
 _BM25 = None
 _JOB_INDEX = None
+_JOB_META = None
+
+# Guards the one-time build so concurrent callers don't duplicate the work
+_LOCK = threading.Lock()
+
+# Invoked whenever the jobs watcher applies a change event (set by the app
+# so stale derived results can be invalidated)
+_ON_CHANGE = None
+
+def set_on_change(callback):
+    """Register a callback to run when the job index changes."""
+    global _ON_CHANGE
+    _ON_CHANGE = callback
+
+def _notify_change():
+    if _ON_CHANGE is not None:
+        _ON_CHANGE()
 
 def startup_load(base_dir=None):
     """
     Load job data and build (or load) the BM25 model once at app startup.
     Raises on missing/malformed files so startup fails fast if something's wrong.
+    Safe to call concurrently: late callers wait on the lock and return once
+    the first build has finished.
     """
-    global _JOBS, _BM25, _JOB_INDEX
+    global _JOBS, _BM25, _JOB_INDEX, _JOB_META
 
-    if base_dir is None:
-        base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+    with _LOCK:
+        if _BM25 is not None:
+            return
 
-    # 1) Load jobs from MongoDB Atlas instead of local JSONL
-    try:
-        jobs = load_jobs_from_mongo()
-    except Exception as e:
-        raise RuntimeError(f"▸ failed to load jobs from MongoDB: {e!s}")
+        if base_dir is None:
+            base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+        # 1) Load jobs from MongoDB Atlas instead of local JSONL
+        try:
+            jobs = load_jobs_from_mongo()
+        except Exception as e:
+            raise RuntimeError(f"▸ failed to load jobs from MongoDB: {e!s}")
+
+        _JOBS = jobs
+
+        # 2) Build or load BM25 index & model
+        _BM25, _JOB_INDEX, _JOB_META = build_or_load_bm25(_JOBS, cache_dir=base_dir)
 
-    _JOBS = jobs
+        # 3) Keep the index fresh via change-stream events instead of rebuilds
+        try:
+            start_jobs_watcher(_JOBS, _BM25, _JOB_INDEX, _JOB_META,
+                               cache_dir=base_dir, on_change=_notify_change)
+        except Exception as e:
+            print("⚠️ Could not start jobs watcher (index will go stale):", str(e))
 
-    # 2) Build or load BM25 index & model
-    _BM25, _JOB_INDEX = build_or_load_bm25(_JOBS, cache_dir=base_dir)
-    print("✅ Jobs and BM25 model loaded in startup_load()")
+        print("✅ Jobs and BM25 model loaded in startup_load()")
 
 
 def run_bm25_match(student_data):
@@ -37,15 +73,15 @@ def run_bm25_match(student_data):
     Matches students to jobs using the preloaded jobs/BM25 model.
     Returns (matches, pickle_path).
     """
-    global _JOBS, _BM25, _JOB_INDEX
+    global _JOBS, _BM25, _JOB_INDEX, _JOB_META
 
     # Ensure startup_load has been called
-    if _JOBS is None or _BM25 is None or _JOB_INDEX is None:
+    if _JOBS is None or _BM25 is None or _JOB_META is None:
         startup_load()
 
     try:
         # 3) Perform the matching
-        matches = match_students_to_jobs(student_data, _JOBS, _BM25, _JOB_INDEX)
+        matches = match_students_to_jobs(student_data, _JOB_META, _BM25)
 
         # 4) Optionally cache the results to disk for debugging
         base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
@@ -53,10 +89,11 @@ def run_bm25_match(student_data):
         with open(pkl_path, "wb") as f:
             pickle.dump(matches, f)
 
-        print(f"🎯 run_bm25_match: matched {len(matches)} students; results saved to {pkl_path}")
+        logger.debug("run_bm25_match: matched %d students; results saved to %s",
+                     len(matches), pkl_path)
         return matches, pkl_path
 
-    except Exception as e:
+    except Exception:
         # Log and re-raise so you see a clear error in your logs
-        print("❌ run_bm25_match failed:", str(e))
+        logger.exception("run_bm25_match failed")
         raise